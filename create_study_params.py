@@ -2,6 +2,8 @@ import argparse
 
 import json
 
+_EDGE_STARTS = ("-", "<")
+
 
 def create_study_params(file_path):
     """
@@ -9,14 +11,10 @@ def create_study_params(file_path):
     :param file_path: path to daggity.txt
     :return: json with study design.
     """
-    f = open(file_path, "r")
-    rows = f.read().split("\n")
+    with open(file_path, "r") as f:
+        rows = f.read().split("\n")
     rows = rows[1:-2]
 
-    nodes = []
-    outgoing = []
-    incoming = []
-
     def_parmas = {
         "constant": False,
         "distribution": "normal",
@@ -25,44 +23,29 @@ def create_study_params(file_path):
         "boarders": (-1, 1),
     }
 
-    exposures = []
-    outcomes = []
+    rows_params = {"exposures": {}, "outcome": {}, "variables": {}, "dependencies": {}}
 
+    # Nodes and edges are classified within a single pass over the rows
     for row in rows:
         values = row.split(" ")
-        if values[1][0] not in ["-", "<"]:
-            if "outcome" in values[1]:
-                outcomes.append(values[0])
-            elif "exposure" in values[1]:
-                exposures.append(values[0])
-            nodes.append(values[0])
-        else:
-            outgoing.append(values[0])
-            incoming.append(values[2])
-
-    rows_params = {"exposures": {}, "outcome": {}, "variables": {}, "dependencies": {}}
-
-    for node in nodes:
-        if node in exposures:
-            rows_params["exposures"][node] = {
-                "gamma": 1,
-                "tau": 1,
-                "treatment_effect": 1,
-            }
-        elif node in outcomes:
+        if values[1].startswith(_EDGE_STARTS):
+            rows_params["dependencies"][f"{values[0]} -> {values[2]}"] = 1
+        elif "outcome" in values[1]:
             rows_params["outcome"] = {
-                "name": node,
+                "name": values[0],
                 "X_0": 0,
                 "sigma_b": 0.1,
                 "sigma_0": 0.1,
                 "boarders": (-1, 1),
             }
+        elif "exposure" in values[1]:
+            rows_params["exposures"][values[0]] = {
+                "gamma": 1,
+                "tau": 1,
+                "treatment_effect": 1,
+            }
         else:
-            rows_params["variables"][node] = def_parmas
-    rows_params["dependencies"] = {
-        "{} -> {}".format(out_edge, in_edge): 1
-        for out_edge, in_edge in zip(outgoing, incoming)
-    }
+            rows_params["variables"][values[0]] = def_parmas
     return rows_params
 
 
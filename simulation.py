@@ -1,9 +1,11 @@
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+from numba import njit
+from scipy.signal import fftconvolve
 
+from collections import deque
 from datetime import timedelta
-import math
 
 
 def normalize(data):
@@ -12,8 +14,59 @@ def normalize(data):
     :param data:
     :return:
     """
-    data = np.array(data)
-    return (data - data.mean()) / data.std()
+    # No copy for float arrays, the result is the only new allocation
+    data = np.asarray(data, dtype=np.float64)
+    normalized = data - data.mean()
+    normalized /= data.std()
+    return normalized
+
+
+def lagged_effect(data, effects):
+    """
+    Computes the effect of the previous days on each day
+    :param data: values of the dependency
+    :param effects: effect per lag, starting with the previous day
+    :return: numpy array
+    """
+    data = np.asarray(data, dtype=float)
+    effects = np.asarray(effects, dtype=float)
+    # FFT based convolution only pays off for long lags
+    convolve = fftconvolve if len(effects) > 32 else np.convolve
+    contribution = np.zeros(len(data))
+    contribution[1:] = convolve(data, effects)[: len(data) - 1]
+    return contribution
+
+
+def weighted_sum(columns, weights):
+    """
+    Sums up equally long columns in a single matrix-vector product
+    :param columns: list of columns
+    :param weights: weight for each column
+    :return: numpy array
+    """
+    matrix = np.stack([np.asarray(column, dtype=float) for column in columns])
+    return np.asarray(weights, dtype=float) @ matrix
+
+
+def clip_bounds(boarders):
+    """
+    Transforms boarders into bounds for clipping, an unset boarder does not clip
+    :param boarders: tuple of lower, upper bound, each may be None
+    :return: lower, upper
+    """
+    lower = -np.inf if boarders[0] is None else boarders[0]
+    upper = np.inf if boarders[1] is None else boarders[1]
+    return lower, upper
+
+
+def _fits_int16(value):
+    """
+    Checks whether a value is a whole number within the int16 range
+    :param value: number
+    :return: bool
+    """
+    info = np.iinfo(np.int16)
+    return float(value).is_integer() and info.min <= value <= info.max
 
 
 def extract_dependencies(nodes, dependencies):
@@ -32,6 +85,82 @@ def extract_dependencies(nodes, dependencies):
     return dependencies_dict
 
 
+def order_nodes(dependencies_dict):
+    """
+    Orders the nodes topologically, such that each node follows its dependencies
+    :param dependencies_dict: dictionary of node and its dependencies
+    :return: list of ordered nodes or None, if the graph contains a cycle
+    """
+    children = {node: [] for node in dependencies_dict}
+    in_degree = {}
+    for node, dependencies in dependencies_dict.items():
+        in_degree[node] = len(set(dependencies))
+        for dependency in set(dependencies):
+            children[dependency].append(node)
+
+    queue = deque(node for node, degree in in_degree.items() if degree == 0)
+    final_order = []
+    while queue:
+        node = queue.popleft()
+        final_order.append(node)
+        for child in children[node]:
+            in_degree[child] -= 1
+            if in_degree[child] == 0:
+                queue.append(child)
+
+    if len(final_order) < len(dependencies_dict):
+        return None
+    return final_order
+
+
+@njit(cache=True, fastmath=True)
+def _gen_treatment_effect(treatment, gamma, tau, treatment_effect):
+    """
+    Compiled recurrence of the treatment effect driver
+    :param treatment: contiguous int8 array defines the treatment for each day
+    :param gamma: float defines the gamma in the treatment effect driver
+    :param tau: float defines the tau in the treatment effect driver
+    :param treatment_effect: treatment effect for this treatment
+    :return: numpy array
+    """
+    x = np.empty(len(treatment))
+    for time_point in range(len(treatment)):
+        if time_point == 0:
+            x_j = 0.0
+        else:
+            x_j = x[time_point - 1]
+        x[time_point] = (
+            x_j
+            + ((treatment_effect - x_j) / tau) * treatment[time_point]
+            - (x_j / gamma) * (1 - treatment[time_point])
+        )
+    return x
+
+
+@njit(cache=True, boundscheck=False)
+def _clamped_cumsum(x_0, noise, lower, upper):
+    """
+    Cumulative sum, which is clamped after every step. The clamped value is
+    the start for the next step.
+    :param x_0: start value
+    :param noise: steps to sum up
+    :param lower: lower bound
+    :param upper: upper bound
+    :return: numpy array
+    """
+    out = np.empty(noise.size)
+    last = x_0
+    for i in range(noise.size):
+        value = last + noise[i]
+        if value < lower:
+            value = lower
+        elif value > upper:
+            value = upper
+        out[i] = value
+        last = value
+    return out
+
+
 class Simulation:
     def __init__(self, parameter, random_generator=np.random.default_rng(None)):
         """
@@ -51,7 +180,16 @@ class Simulation:
             ],
             parameter["dependencies"],
         )
+        # Order variables based on their dependencies
+        self._ordered_nodes = order_nodes(self.dependencies)
         self.effect_sizes = parameter["dependencies"]
+        # Cache lookups, which do not change between patients
+        self._exposure_set = frozenset(self.exposures_params)
+        self._outcome_name = self.outcome_params["name"]
+        self._effect_keys = {
+            tuple(dependency.split(" -> ")): effect
+            for dependency, effect in self.effect_sizes.items()
+        }
         if "over_time_dependencies" in parameter.keys():
             self.over_time_dependencies = parameter["over_time_dependencies"]
         else:
@@ -80,7 +218,7 @@ class Simulation:
         :param data: already simulated data
         :param length: length of study
         :param dependencies: dependencies
-        :param causal_effects: causal effects
+        :param causal_effects: causal effects keyed by (cause, effect)
         :param boarders: tuple of lower, upper bound
         :return: baseline_drift, underlying_state, observation
         """
@@ -91,48 +229,42 @@ class Simulation:
             sigma=outcome_params["sigma_b"],
             outcome_scale=outcome_params["boarders"],
             mu=outcome_params.get("mu_b", 0),
-        )
+        ).astype(np.float32)
 
         # underlying state
         underlying_state = baseline_drift.copy()
-        for dependency in dependencies:
-            if dependency in treatments:
-                underlying_state += np.array(data["{}_effect".format(dependency)])
-            else:
-                underlying_state += (
-                    np.array(data[dependency])
-                    * causal_effects[
-                        "{} -> {}".format(dependency, outcome_params["name"])
-                    ]
-                )
+        if dependencies:
+            treatments = set(treatments)
+            columns, weights = [], []
+            for dependency in dependencies:
+                if dependency in treatments:
+                    columns.append(data["{}_effect".format(dependency)])
+                    weights.append(1.0)
+                else:
+                    columns.append(data[dependency])
+                    weights.append(causal_effects[(dependency, outcome_params["name"])])
+            underlying_state += weighted_sum(columns, weights)
 
         if over_time_effects:
-            for dependency in list(over_time_effects):
-                for i in range(len(underlying_state)):
-                    for lag, effect in enumerate(
-                        over_time_effects[dependency]["effects"]
-                    ):
-                        underlying_state[i] += (
-                            data[dependency][i - 1 - lag] * effect
-                            if (i - 1 - lag) >= 0
-                            else 0
-                        )
-
-        underlying_state = [
-            boarders[1] if u > boarders[1] else u for u in underlying_state
-        ]
-        underlying_state = [
-            boarders[0] if u < boarders[0] else u for u in underlying_state
-        ]
+            for dependency, over_time_effect in over_time_effects.items():
+                underlying_state += lagged_effect(
+                    data[dependency], over_time_effect["effects"]
+                )
 
-        # Observation
-        observation = [
-            round(u + self.random_generator.normal(0, outcome_params["sigma_0"]))
-            for u in underlying_state
-        ]
+        np.clip(underlying_state, boarders[0], boarders[1], out=underlying_state)
 
-        observation = [boarders[1] if u > boarders[1] else u for u in observation]
-        observation = [boarders[0] if u < boarders[0] else u for u in observation]
+        # Observation
+        # Rounding and clipping work in place on the noisy state
+        observation = underlying_state + self.random_generator.normal(
+            0, outcome_params["sigma_0"], size=length
+        )
+        np.rint(observation, out=observation)
+        np.clip(observation, boarders[0], boarders[1], out=observation)
+        # Observations are whole numbers, store them compact if the scale allows
+        if all(_fits_int16(boarder) for boarder in boarders):
+            observation = observation.astype(np.int16)
+        else:
+            observation = observation.astype(np.float32)
 
         return baseline_drift, underlying_state, observation
 
@@ -152,28 +284,27 @@ class Simulation:
         :param treatment: treatment name
         :param dependencies: variables, which have an causal effect on the treatment
         :param params: additional params
-        :param causal_effects: causal effects
+        :param causal_effects: causal effects keyed by (cause, effect)
         :param data: generated data
         :return: treatment_arr, treatment_effect
         """
 
-        treatment_arr = []
         # Generate treatment array based on default study design
-        for i in range(0, len(study_design)):
-            if study_design[i] == treatment:
-                treatment_arr.extend([1] * days_per_period)
-            else:
-                treatment_arr.extend([0] * days_per_period)
+        treatment_arr = np.repeat(
+            (np.asarray(study_design, dtype=object) == treatment).astype(float),
+            days_per_period,
+        )
 
-        # Add dependencies
-        for dependency in dependencies:
-            treatment_arr += (
-                normalize(data[dependency])
-                * causal_effects["{} -> {}".format(dependency, treatment)]
-            )
+        # Add dependencies, which are only known for the current period
+        if dependencies:
+            columns = [normalize(data[dependency]) for dependency in dependencies]
+            weights = [
+                causal_effects[(dependency, treatment)] for dependency in dependencies
+            ]
+            treatment_arr[-days_per_period:] += weighted_sum(columns, weights)
 
         # Clip treatment to 1 or 0
-        treatment_arr = np.where(np.array(treatment_arr) >= 0.5, 1, 0)
+        treatment_arr = (treatment_arr >= 0.5).astype(np.int8)
 
         # Get Params
         gamma = params["gamma"]
@@ -198,18 +329,13 @@ class Simulation:
         :param treatment_effect: treatment effect for this treatment
         :return: numpy array
         """
-        x = np.empty(len(treatment))
-        for time_point in range(len(treatment)):
-            if time_point == 0:
-                x_j = 0
-            else:
-                x_j = x[time_point - 1]
-            x[time_point] = (
-                x_j
-                + ((treatment_effect - x_j) / tau) * treatment[time_point]
-                - (x_j / gamma) * (1 - treatment[time_point])
-            )
-        return x
+        # Fixed dtypes keep numba from compiling a new specialization per call
+        return _gen_treatment_effect(
+            np.ascontiguousarray(treatment, dtype=np.int8),
+            float(gamma),
+            float(tau),
+            float(treatment_effect),
+        )
 
     def gen_baseline_drift(
         self,
@@ -227,64 +353,67 @@ class Simulation:
         :param outcome_scale: defines the scale for the outcome
         :return: drift
         """
-        drift = np.empty(length)
-        for day in range(length):
-            if day == 0:
-                last_day = x_0
-            else:
-                last_day = drift[day - 1]
-            drift_est = last_day + self.random_generator.normal(mu, sigma)
-            if outcome_scale:
-                drift_est = max(drift_est, outcome_scale[0])
-                drift_est = min(drift_est, outcome_scale[1])
-            drift[day] = drift_est
-        return drift
+        noise = self.random_generator.normal(mu, sigma, size=length)
+        if not outcome_scale:
+            return x_0 + np.cumsum(noise)
+
+        return _clamped_cumsum(
+            float(x_0), noise, float(outcome_scale[0]), float(outcome_scale[1])
+        )
 
     def gen_normal_distribution(
         self,
         mean=0,
         std=1,
+        size=None,
         **_args,
     ):
         """
         Generates a value following a normal distribution.
         :param mean:
         :param std:
+        :param size: number of values, None for a single value
         :param _args:
         :return:
         """
-        return self.random_generator.normal(mean, std)
+        return self.random_generator.normal(mean, std, size)
 
-    def gen_flag(self, p1=0.5, **_args):
+    def gen_flag(self, p1=0.5, size=None, **_args):
         """
         Generates a flag.
         :param p1: probability of flag = 1
+        :param size: number of flags, None for a single flag
         :param _args:
         :return: flag
         """
-        return 1 if self.random_generator.normal(0, 100) <= p1 * 100 else 0
+        flags = self.random_generator.random(size) < p1
+        return int(flags) if size is None else flags.astype(np.int64)
 
-    def gen_unit_distribution(self, min_value=0, max_value=10, **_args):
+    def gen_unit_distribution(self, min_value=0, max_value=10, size=None, **_args):
         """
         Returns a value with equal probabilities
         :param min_value:
         :param max_value:
+        :param size: number of values, None for a single value
         :param _args:
         :return:
         """
-        if min_value <= max_value:
-            return self.random_generator.randint(min_value, max_value)
-        else:
+        if min_value < max_value:
+            return self.random_generator.integers(min_value, max_value, size)
+        elif size is None:
             return min_value
+        else:
+            return np.full(size, min_value)
 
-    def gen_poisson_distribution(self, lam, **_args):
+    def gen_poisson_distribution(self, lam, size=None, **_args):
         """
         Returns a poisson distribution based on a lam value
         :param lam:
+        :param size: number of values, None for a single value
         :param _args:
         :return:
         """
-        return self.random_generator.poisson(lam)
+        return self.random_generator.poisson(lam, size)
 
     def gen_distribution(
         self,
@@ -315,12 +444,42 @@ class Simulation:
         else:
             val = None
 
-        if boarders[1] and distribution.lower() != "not":
-            val = boarders[1] if val > boarders[1] else val
-        if boarders[0] and distribution.lower() != "not":
-            val = boarders[0] if val < boarders[0] else val
+        if distribution.lower() != "not":
+            lower, upper = clip_bounds(boarders)
+            val = min(max(val, lower), upper)
         return val
 
+    def _gen_distribution_array(self, length, distribution, boarders=(0, 1), **params):
+        """
+        Generates an array of independent values of a given distribution and params.
+        :param length: number of values
+        :param distribution: name of distribution (normal, poisson, unit, flag)
+        :param boarders: defines the min and maximum value
+        :param params:
+        :return: numpy array
+        """
+        distribution = distribution.lower()
+        if distribution == "normal":
+            values = self.gen_normal_distribution(size=length, **params)
+        elif distribution == "flag":
+            values = self.gen_flag(size=length, **params)
+        elif distribution == "poisson":
+            values = self.gen_poisson_distribution(size=length, **params)
+        elif distribution == "unit":
+            values = self.gen_unit_distribution(boarders[0], boarders[1], size=length)
+        elif distribution == "not":
+            return np.full(length, params.get("value", 0), dtype=float)
+        else:
+            # No vectorized generator, draw each value on its own
+            return np.array(
+                [
+                    self.gen_distribution(distribution, boarders, **params)
+                    for _ in range(length)
+                ],
+                dtype=float,
+            )
+        return np.clip(values.astype(float), *clip_bounds(boarders))
+
     def simulate_node(
         self, node, dependencies, length, data, params, causal_effects, over_time_effects=None
     ):
@@ -331,43 +490,27 @@ class Simulation:
         :param length: length of the simulation
         :param data: simulated data
         :param params: parameters for the feature
-        :param causal_effects: causal effect
-        :return: return a list of simulated values
+        :param causal_effects: causal effect keyed by (cause, effect)
+        :return: return an array of simulated values
         """
 
+        boarders = params["boarders"]
         if params["constant"]:
-            result = [self.gen_distribution(**params)] * length
+            result = np.full(length, self.gen_distribution(**params), dtype=float)
         else:
-            result = []
-            for i in range(length):
-                variable = self.gen_distribution(**params)
-                for dependency in dependencies:
-                    variable += (
-                        data[dependency][i]
-                        * causal_effects["{} -> {}".format(dependency, node)]
+            result = self._gen_distribution_array(length, **params)
+            if dependencies:
+                result += weighted_sum(
+                    [data[dependency] for dependency in dependencies],
+                    [causal_effects[(dependency, node)] for dependency in dependencies],
+                )
+            if over_time_effects:
+                for dependency, over_time_effect in over_time_effects.items():
+                    result += lagged_effect(
+                        data[dependency], over_time_effect["effects"]
                     )
-                if over_time_effects:
-                    for dependency in list(over_time_effects):
-                        for lag, effect in enumerate(
-                            over_time_effects[dependency]["effects"]
-                        ):
-                            variable += (
-                                data[dependency][i - 1 - lag] * effect
-                                if (i - 1 - lag) >= 0
-                                else 0
-                            )
-                result.append(variable)
-        if params["boarders"]:
-            if params["boarders"][0]:
-                result = [
-                    params["boarders"][0] if val < params["boarders"][0] else val
-                    for val in result
-                ]
-            if params["boarders"][1]:
-                result = [
-                    params["boarders"][1] if val > params["boarders"][1] else val
-                    for val in result
-                ]
+        if boarders:
+            np.clip(result, *clip_bounds(boarders), out=result)
         return result
 
     def gen_drop_out(
@@ -389,20 +532,25 @@ class Simulation:
             keep_columns = ["patient_id", "date", "day", "Treatment_1", "Treatment_2"]
             drop_columns = list(set(list(data.columns)) - set(keep_columns))
 
-        treatment_data = data.copy().drop(columns=drop_columns)
+        treatment_data = data.drop(columns=drop_columns)
 
         # Apply vacation:
         # Continues period without any data
         if vacation:
-            start = self.random_generator.randint(1, len(data) - vacation)
+            start = self.random_generator.integers(1, len(data) - vacation)
             data = pd.concat([data[:start], data[start + vacation :]])
 
         # Drop out:
         # random drop out of data
         if fraction:
-            weights_drop_out = 1 / (np.array(list(range(len(data)))) + 1) ** 2
-            weights_drop_out = 1 / (np.array(list(range(len(data)))) + 1)
-            data = data.sample(frac=fraction, weights=weights_drop_out)
+            weights_drop_out = 1.0 / np.arange(1, len(data) + 1)
+            keep = self.random_generator.choice(
+                len(data),
+                size=round(fraction * len(data)),
+                replace=False,
+                p=weights_drop_out / weights_drop_out.sum(),
+            )
+            data = data.iloc[keep]
 
         # ToDo: Others?
         data = treatment_data.join(data[drop_columns])
@@ -427,87 +575,141 @@ class Simulation:
         :param days_per_period: days per period
         :return: pandas data frame
         """
-        # Define length of study
-        length = days_per_period
-
         # Generate Dateindex, Treatmentvariable and bloc
-        last_day = data[data["patient_id"] == patient_id]["date"].max()
-        if first_day is None and last_day is not None:
-            first_day = last_day + timedelta(days=1)
-        dti = pd.date_range(first_day, periods=length, freq="D")
-        study_design = []
-        if len(data):
+        # from a single slice of the patient's previous periods
+        patient_data = data.loc[
+            data["patient_id"] == patient_id, ["date", "block", "day", "treatment"]
+        ]
+        if len(patient_data):
+            blocks = patient_data["block"].to_numpy()
+            # Treatments are constant within a block, take the first day of each
+            _, first_index = np.unique(blocks, return_index=True)
             study_design = [
-                *data[data["patient_id"] == patient_id]
-                .groupby(["block"])
-                .sample(n=1)["treatment"],
-                *[treatment],
+                *patient_data["treatment"].to_numpy()[first_index],
+                treatment,
             ]
+            if first_day is None:
+                first_day = patient_data["date"].max() + timedelta(days=1)
+            current_block_index = blocks.max() + 1
+            start_day_number = round(patient_data["day"].max() + 1)
         else:
             study_design = [treatment]
+            current_block_index = 1
+            start_day_number = 1
 
-        current_block_index = data[data["patient_id"] == patient_id]["block"].max() + 1
-        current_block_index = (
-            current_block_index if not math.isnan(current_block_index) else 1
+        added_data = pd.DataFrame(
+            self._simulate_period(
+                treatment,
+                study_design,
+                days_per_period,
+                patient_id,
+                first_day,
+                current_block_index,
+                start_day_number,
+            )
         )
-        block = [current_block_index] * length
-
-        # Generate Variables with dependencies
-        def _order_nodes(dependency_dict):
-            final_order = []
-            dependencies = [(n, set(dependency_dict[n])) for n in dependency_dict]
-            while len(dependencies) > 0:
-                dependencies.sort(key=lambda s: len(s[1]))
-                if len(dependencies[0][1]) == 0:
-                    n = dependencies.pop(0)[0]
-                    final_order.append(n)
-                    for dep in dependencies:
-                        dep[1].discard(n)
-                else:
-                    return None
-            return final_order
+        data = pd.concat([data, added_data]).reset_index(drop=True)
 
-        # Order variables based on their dependencies
-        ordered_node = _order_nodes(self.dependencies)
+        if drop_out:
+            return data, self.gen_drop_out(data.copy(), **drop_out)
+        return data
 
-        start_day_number = data[data["patient_id"] == patient_id]["day"].max()
-        if math.isnan(start_day_number):
-            start_day_number = 1
-        else:
-            start_day_number = round(start_day_number + 1)
-        # Generate Data
+    def gen_patient(
+        self,
+        study_design,
+        days_per_period,
+        patient_id=0,
+        drop_out=None,
+        first_day=None,
+    ):
+        """
+        This function generates a person for a complete study design
+        :param study_design: study design, list of treatments per period
+        :param days_per_period: days per period
+        :param patient_id: id of the patient
+        :param drop_out: parameters for gen_drop_out
+        :param first_day: first day of the study, defaults to today
+        :return: pandas data frame
+        """
+        if first_day is None:
+            first_day = pd.Timestamp.today().normalize()
+
+        # Collect the periods column wise and build the data frame once
+        columns = {column: [] for column in self.empty_dataframe().columns}
+        for period, treatment in enumerate(study_design):
+            result = self._simulate_period(
+                treatment,
+                study_design[: period + 1],
+                days_per_period,
+                patient_id,
+                first_day + timedelta(days=period * days_per_period),
+                period + 1,
+                period * days_per_period + 1,
+            )
+            for column, values in result.items():
+                columns.setdefault(column, []).append(values)
+        data = pd.DataFrame(
+            {column: np.concatenate(values) for column, values in columns.items()}
+        )
+        data = data.astype({"patient_id": "category", "treatment": "category"})
+
+        if drop_out:
+            return data, self.gen_drop_out(data.copy(), **drop_out)
+        return data
+
+    def _simulate_period(
+        self,
+        treatment,
+        study_design,
+        days_per_period,
+        patient_id,
+        first_day,
+        block_index,
+        start_day_number,
+    ):
+        """
+        This function simulates all nodes for a single period
+        :param treatment: treatment of this period
+        :param study_design: treatments of all periods up to this one
+        :param days_per_period: days per period
+        :param patient_id: id of the patient
+        :param first_day: date of the first day in this period
+        :param block_index: index of this period
+        :param start_day_number: number of the first day in this period
+        :return: dictionary with an array per column
+        """
+        length = days_per_period
         result = {
-            "patient_id": [patient_id] * length,
-            "date": dti,
-            "block": block,
-            "day": list(range(start_day_number, start_day_number + length)),
+            "patient_id": np.full(length, patient_id),
+            "date": pd.date_range(first_day, periods=length, freq="D"),
+            "block": np.full(length, block_index),
+            "day": np.arange(start_day_number, start_day_number + length),
         }
 
-        for node in ordered_node:
-            if node not in list(self.over_time_dependencies.keys()):
-                self.over_time_dependencies[node] = None
+        for node in self._ordered_nodes:
+            over_time_effects = self.over_time_dependencies.get(node)
             # if node is exposure
-            if node in list(self.exposures_params.keys()):
+            if node in self._exposure_set:
                 t = self.simulate_treatment(
                     study_design,
                     days_per_period,
                     node,
                     self.dependencies[node],
                     self.exposures_params[node],
-                    self.effect_sizes,
+                    self._effect_keys,
                     result,
                 )
                 result[node], result["{}_effect".format(node)] = t
             # generate outcome
-            elif node == self.outcome_params["name"]:
+            elif node == self._outcome_name:
                 o = self.simulate_outcome(
                     outcome_params=self.outcome_params,
                     data=result,
                     length=length,
                     dependencies=self.dependencies[node],
-                    treatments=list(self.exposures_params.keys()),
-                    causal_effects=self.effect_sizes,
-                    over_time_effects=self.over_time_dependencies[node],
+                    treatments=self._exposure_set,
+                    causal_effects=self._effect_keys,
+                    over_time_effects=over_time_effects,
                 )
                 result["baseline_drift"], result["underlying_state"], result[node] = o
             # if node is variable
@@ -518,18 +720,12 @@ class Simulation:
                     length,
                     result,
                     params=self.variables[node],
-                    causal_effects=self.effect_sizes,
-                    over_time_effects=self.over_time_dependencies[node],
+                    causal_effects=self._effect_keys,
+                    over_time_effects=over_time_effects,
                 )
 
-        added_data = pd.DataFrame(result)
-        added_data["treatment"] = [treatment] * length
-
-        data = pd.concat([data, added_data]).reset_index(drop=True)
-
-        if drop_out:
-            return data, self.gen_drop_out(data.copy(), **drop_out)
-        return data
+        result["treatment"] = np.full(length, treatment, dtype=object)
+        return result
 
     def plot_patient(self, patient):
         """